@@ -1,6 +0,0 @@
-import gi
-gi.require_version("Gdk", "3.0")
-gi.require_version("Gio", "2.0")
-gi.require_version("GLib", "2.0")
-gi.require_version("Gtk", "3.0")
-gi.require_version("GtkLayerShell", "0.1")
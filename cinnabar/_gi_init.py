@@ -0,0 +1,16 @@
+"""Select the GObject introspection library versions used by cinnabar.
+
+This lives outside of the package __init__ so that modules which do not use
+GObject introspection (such as the Sway IPC client and config loading) can be
+imported without loading gi. Modules that import from gi.repository import this
+module first; Python caches it after the first import, so the versions are only
+resolved once.
+"""
+import gi
+
+
+gi.require_version("Gdk", "3.0")
+gi.require_version("Gio", "2.0")
+gi.require_version("GLib", "2.0")
+gi.require_version("Gtk", "3.0")
+gi.require_version("GtkLayerShell", "0.1")
@@ -1,21 +1,25 @@
 from __future__ import annotations
 
 import signal
+from typing import TYPE_CHECKING
 
-import nestedtext
+import cinnabar._gi_init  # noqa: F401
 from gi.repository import Gdk, Gio, GLib, Gtk
 
-from cinnabar.bar import Bar
+from cinnabar.config import load_config
+
+if TYPE_CHECKING:
+    from cinnabar.bar import Bar
 
 
 class Application(Gtk.Application):
-    _bars: list[Bar] = []
-    """List of bars being displayed (one per output)."""
+    _bars: dict[Gdk.Monitor, Bar]
+    """Bars being displayed (one per output), keyed by their monitor."""
 
-    _config: dict = {}
+    _config: dict
     """Application configuration loaded from the config file."""
 
-    _outputs: list[str] = []
+    _outputs: list[str]
     """List of outputs on which the bar should be displayed."""
 
     def __init__(self, *args, **kwargs) -> None:
@@ -31,6 +35,10 @@ class Application(Gtk.Application):
             **kwargs,
         )
 
+        self._bars = {}
+        self._config = {}
+        self._outputs = []
+
         self.add_main_option(
             "config",
             ord("c"),
@@ -42,31 +50,28 @@ class Application(Gtk.Application):
         GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGINT, self.quit)
 
     @property
-    def outputs(self):
-        if self._outputs:
-            return self._outputs
-
-        cfg_outputs: list[str] | str = self._config.get("output", [])
-        if isinstance(cfg_outputs, str):
-            cfg_outputs = [cfg_outputs]
-
-        self._outputs = cfg_outputs
+    def outputs(self) -> list[str]:
         return self._outputs
 
     def do_startup(self) -> None:
         Gtk.Application.do_startup(self)
 
+        # Bars are only created for connected outputs that match the config,
+        # so there may be no windows to keep the application running. Hold it
+        # so that bars can still be added when a matching output is plugged in.
+        self.hold()
+
     def do_command_line(self, command_line: Gio.ApplicationCommandLine) -> int:
         options = command_line.get_options_dict()
         options = options.end().unpack()
 
         if "config" in options:
-            with open(options["config"], "r") as f:
-                loaded_config = nestedtext.load(f)
-                if isinstance(loaded_config, dict):
-                    self._config = loaded_config
-                else:
-                    raise RuntimeError("Invalid config file.")
+            self._config = load_config(options["config"])
+
+        cfg_outputs: list[str] | str = self._config.get("output") or []
+        if isinstance(cfg_outputs, str):
+            cfg_outputs = [cfg_outputs]
+        self._outputs = cfg_outputs
 
         self.activate()
         return 0
@@ -81,17 +86,24 @@ class Application(Gtk.Application):
         for i in range(monitor_count):
             monitor = display.get_monitor(i)
             if monitor is not None:
-                self.monitor_added(display, monitor)
+                self._add_bar(display, monitor, i)
 
         display.connect("monitor-added", self.monitor_added)
         display.connect("monitor-removed", self.monitor_removed)
 
-    def monitor_added(self, display: Gdk.Display, monitor: Gdk.Monitor):
+    def monitor_added(
+        self,
+        display: Gdk.Display,
+        monitor: Gdk.Monitor,
+    ) -> None:
+        # GDK appends newly added monitors to the display's monitor list, so
+        # search from the end to find the index of the new monitor.
         monitor_idx = None
         monitor_count = display.get_n_monitors()
-        for i in range(monitor_count):
+        for i in reversed(range(monitor_count)):
             if display.get_monitor(i) == monitor:
                 monitor_idx = i
+                break
 
         if monitor_idx is None:
             error = "Unable to get information for monitor: {} {}".format(
@@ -100,17 +112,28 @@ class Application(Gtk.Application):
             )
             raise RuntimeError(error)
 
+        self._add_bar(display, monitor, monitor_idx)
+
+    def _add_bar(
+        self,
+        display: Gdk.Display,
+        monitor: Gdk.Monitor,
+        monitor_idx: int,
+    ) -> None:
+        # The bar module (which pulls in GtkLayerShell) is only needed once a
+        # bar is created, so it is imported here rather than at module load to
+        # keep command line handling cheap.
+        from cinnabar.bar import Bar
+
         output = display.get_default_screen().get_monitor_plug_name(
             monitor_idx
         )
-        self._bars.append(Bar(self, monitor, output, self._config))
+        if self.outputs and output not in self.outputs:
+            return
 
-    def monitor_removed(self, _: Gdk.Display, monitor: Gdk.Monitor):
-        monitor_idx = None
-        for i in range(len(self._bars)):
-            if self._bars[i].monitor == monitor:
-                monitor_idx = i
-                break
+        self._bars[monitor] = Bar(self, monitor, output, self._config)
 
-        if monitor_idx is not None:
-            del self._bars[monitor_idx]
+    def monitor_removed(self, _: Gdk.Display, monitor: Gdk.Monitor) -> None:
+        bar = self._bars.pop(monitor, None)
+        if bar is not None:
+            bar.dispose()
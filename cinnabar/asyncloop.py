@@ -0,0 +1,68 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Coroutine
+
+
+DEFAULT_EXECUTOR_WORKERS = 4
+
+_event_loop: asyncio.AbstractEventLoop | None = None
+"""Event loop shared by the whole process, started on first use."""
+
+_event_loop_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Get the event loop shared by all of cinnabar's asynchronous tasks.
+
+    The event loop and the daemon thread that runs it are created the first
+    time this is called, and are shared by the rest of the process afterwards.
+    uvloop is used for the event loop if it is installed. The loop's default
+    executor is capped at DEFAULT_EXECUTOR_WORKERS threads.
+
+    Returns:
+        asyncio.AbstractEventLoop: The shared event loop.
+    """
+    global _event_loop
+
+    with _event_loop_lock:
+        if _event_loop is None:
+            _event_loop = _new_event_loop()
+            _event_loop.set_default_executor(
+                ThreadPoolExecutor(max_workers=DEFAULT_EXECUTOR_WORKERS)
+            )
+            event_loop_thread = threading.Thread(
+                target=_event_loop_worker,
+                args=(_event_loop,),
+                daemon=True,
+            )
+            event_loop_thread.start()
+
+    return _event_loop
+
+
+def submit(coroutine: Coroutine) -> Future:
+    """Run the given coroutine on the shared event loop.
+
+    This is safe to call from any thread.
+
+    Args:
+        coroutine (Coroutine): The coroutine to run.
+
+    Returns:
+        Future: A future for the result of the coroutine.
+    """
+    return asyncio.run_coroutine_threadsafe(coroutine, get_loop())
+
+
+def _new_event_loop() -> asyncio.AbstractEventLoop:
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.new_event_loop()
+    return uvloop.new_event_loop()
+
+
+def _event_loop_worker(loop: asyncio.AbstractEventLoop) -> None:
+    asyncio.set_event_loop(loop)
+    loop.run_forever()
@@ -1,41 +1,36 @@
 from __future__ import annotations
 
 import importlib
-import inspect
 from abc import ABC, abstractmethod
-from enum import Enum
 
-from gi.repository import Gdk, Gtk, GtkLayerShell
+import cinnabar._gi_init  # noqa: F401
+from gi.repository import Gdk, GLib, Gtk, GtkLayerShell
 
+from cinnabar.position import BarPosition
 
-class BarPosition(Enum):
-    TOP = "top"
-    BOTTOM = "bottom"
-    LEFT = "left"
-    RIGHT = "right"
 
-    @classmethod
-    def from_str(cls, string: str) -> BarPosition:
-        key = string.upper()
-        for val in BarPosition:
-            if key == val.name:
-                return val
+_LAYER_SHELL_EDGES = {
+    BarPosition.TOP: GtkLayerShell.Edge.TOP,
+    BarPosition.BOTTOM: GtkLayerShell.Edge.BOTTOM,
+    BarPosition.LEFT: GtkLayerShell.Edge.LEFT,
+    BarPosition.RIGHT: GtkLayerShell.Edge.RIGHT,
+}
+"""Layer shell edge that the bar is anchored to for each BarPosition."""
 
-        raise ValueError(
-            "'{}' is not a valid BarPosition, "
-            "must be top, bottom, left, or right".format(str)
-        )
+_STRETCH_EDGES = {
+    Gtk.Orientation.HORIZONTAL: (
+        GtkLayerShell.Edge.LEFT,
+        GtkLayerShell.Edge.RIGHT,
+    ),
+    Gtk.Orientation.VERTICAL: (
+        GtkLayerShell.Edge.TOP,
+        GtkLayerShell.Edge.BOTTOM,
+    ),
+}
+"""Layer shell edges that stretch a bar with no set length along its axis."""
 
-    def to_layer_shell_edge(self) -> GtkLayerShell.Edge:
-        match self:
-            case BarPosition.TOP:
-                return GtkLayerShell.Edge.TOP
-            case BarPosition.BOTTOM:
-                return GtkLayerShell.Edge.BOTTOM
-            case BarPosition.LEFT:
-                return GtkLayerShell.Edge.LEFT
-            case BarPosition.RIGHT:
-                return GtkLayerShell.Edge.RIGHT
+_VERTICAL_POSITIONS = frozenset({BarPosition.LEFT, BarPosition.RIGHT})
+"""Bar positions at which the bar is laid out vertically."""
 
 
 class Bar:
@@ -48,15 +43,16 @@ class Bar:
     _position: BarPosition
     """Which edge of the screen the bar should be anchored to."""
 
-    _begin_widgets: list[WidgetPlugin] = []
-    _mid_widgets: list[WidgetPlugin] = []
-    _end_widgets: list[WidgetPlugin] = []
+    _begin_widgets: list[WidgetPlugin]
+    _mid_widgets: list[WidgetPlugin]
+    _end_widgets: list[WidgetPlugin]
+
+    _orientation: Gtk.Orientation
+    """Direction in which the bar lays out its widgets."""
 
     @property
     def orientation(self) -> Gtk.Orientation:
-        if self._position in [BarPosition.LEFT, BarPosition.RIGHT]:
-            return Gtk.Orientation.VERTICAL
-        return Gtk.Orientation.HORIZONTAL
+        return self._orientation
 
     def __init__(
         self,
@@ -73,6 +69,10 @@ class Bar:
         self._width = int(config.get("width", 0))
         self._height = int(config.get("height", 0))
         self._position = BarPosition.from_str(config.get("position", "top"))
+        if self._position in _VERTICAL_POSITIONS:
+            self._orientation = Gtk.Orientation.VERTICAL
+        else:
+            self._orientation = Gtk.Orientation.HORIZONTAL
 
         widget_config = config.get("widgets", {})
         self._begin_widgets = self._load_widgets(
@@ -87,42 +87,65 @@ class Bar:
 
         self._init_window()
 
-    def __del__(self):
-        self._window.hide()
-        self._app.remove_window(self._window)
+    def dispose(self) -> None:
+        """Destroy the bar's window and release its widget plugins.
+
+        Each widget plugin is disposed first so that it stops its background
+        work. Destroying the window then destroys the plugin widgets inside of
+        it and removes the window from the application. This is done explicitly
+        rather than in __del__, since plugins that keep a reference to their
+        bar form reference cycles that delay or prevent finalization.
+        """
+        for widgets in (
+            self._begin_widgets,
+            self._mid_widgets,
+            self._end_widgets,
+        ):
+            for widget in widgets:
+                widget.dispose()
+
+        if self._show_source is not None:
+            GLib.source_remove(self._show_source)
+            self._show_source = None
+
+        self._window.disconnect(self._destroy_handler)
+        self._window.destroy()
+
+        self._begin_widgets = []
+        self._mid_widgets = []
+        self._end_widgets = []
 
     def _load_widgets(self, configs: list[dict]) -> list[WidgetPlugin]:
         widgets: list[WidgetPlugin] = []
         for config in configs:
             plugin_module_path = "cinnabar.plugins." + config["widget"]
-            module = importlib.import_module(plugin_module_path)
-            classes = inspect.getmembers(module, inspect.isclass)
-            for (_, c) in classes:
-                if issubclass(c, WidgetPlugin) and (c is not WidgetPlugin):
-                    widgets.append(c(self, config))
+            plugin_class = _find_plugin_class(plugin_module_path)
+            widgets.append(plugin_class(self, config))
         return widgets
 
-    def _init_window(self):
-        self._beginning_box = Gtk.Box(orientation=self.orientation, spacing=0)
-        self._middle_box = Gtk.Box(orientation=self.orientation, spacing=0)
-        self._end_box = Gtk.Box(orientation=self.orientation, spacing=0)
+    def _init_window(self) -> None:
+        orientation = self.orientation
+
+        self._beginning_box = Gtk.Box.new(orientation, 0)
+        self._middle_box = Gtk.Box.new(orientation, 0)
+        self._end_box = Gtk.Box.new(orientation, 0)
 
-        self._main_box = Gtk.Box(orientation=self.orientation, spacing=0)
+        self._main_box = Gtk.Box.new(orientation, 0)
         self._main_box.pack_start(self._beginning_box, False, False, 0)
         self._main_box.set_center_widget(self._middle_box)
         self._main_box.pack_end(self._end_box, False, False, 0)
 
-        for widget in self._begin_widgets:
-            self._beginning_box.add(widget.widget())
-
-        for widget in self._mid_widgets:
-            self._middle_box.add(widget.widget())
-
-        for widget in self._end_widgets:
-            self._end_box.add(widget.widget())
+        sections = (
+            (self._beginning_box, self._begin_widgets),
+            (self._middle_box, self._mid_widgets),
+            (self._end_box, self._end_widgets),
+        )
+        for box, widgets in sections:
+            for widget in widgets:
+                box.add(widget.widget())
 
         self._window = Gtk.Window(application=self._app, decorated=False)
-        self._window.connect("destroy", Gtk.main_quit)
+        self._destroy_handler = self._window.connect("destroy", Gtk.main_quit)
         self._window.add(self._main_box)
 
         GtkLayerShell.init_for_window(self._window)
@@ -130,24 +153,38 @@ class Bar:
         GtkLayerShell.set_monitor(self._window, self.monitor)
         GtkLayerShell.set_namespace(self._window, "cinnabar")
 
-        edges = [self._position.to_layer_shell_edge()]
-        if self.orientation == Gtk.Orientation.HORIZONTAL and not self._width:
-            edges.extend([GtkLayerShell.Edge.LEFT, GtkLayerShell.Edge.RIGHT])
-        elif self.orientation == Gtk.Orientation.VERTICAL and not self._height:
-            edges.extend([GtkLayerShell.Edge.TOP, GtkLayerShell.Edge.BOTTOM])
+        if orientation == Gtk.Orientation.HORIZONTAL:
+            length = self._width
+        else:
+            length = self._height
+
+        edges = (_LAYER_SHELL_EDGES[self._position],)
+        if not length:
+            edges += _STRETCH_EDGES[orientation]
 
         for edge in edges:
             GtkLayerShell.set_anchor(self._window, edge, True)
 
         self._window.set_size_request(self._width, self._height)
+
+        # Show the window once the main loop is idle so that the widgets added
+        # above are styled and laid out in a single pass.
+        self._show_source = GLib.idle_add(
+            self._show_window,
+            priority=GLib.PRIORITY_DEFAULT_IDLE,
+        )
+
+    def _show_window(self) -> bool:
+        self._show_source = None
         self._window.show_all()
+        return False
 
 
 class WidgetPlugin(ABC):
     """Plugin that represents a widget that can be added to a bar."""
 
     @abstractmethod
-    def __init__(self, bar: Bar, config: dict):
+    def __init__(self, bar: Bar, config: dict) -> None:
         """Initialize the widget plugin
 
         Args:
@@ -165,3 +202,56 @@ class WidgetPlugin(ABC):
             Gtk.Widget: The widget to be displayed in the bar.
         """
         pass
+
+    def dispose(self) -> None:
+        """Stop any background work of the widget plugin.
+
+        Called when the plugin's bar is removed. Plugins that run timers,
+        threads, or tasks must stop them here, since those keep the plugin and
+        its bar alive after the bar's window is destroyed.
+        """
+        pass
+
+
+_plugin_classes: dict[str, type[WidgetPlugin]] = {}
+"""Cache of the WidgetPlugin class provided by each plugin module."""
+
+
+def _find_plugin_class(plugin_module_path: str) -> type[WidgetPlugin]:
+    """Find the WidgetPlugin class provided by the given plugin module.
+
+    Plugin modules declare their WidgetPlugin class with a module-level
+    `PLUGIN_CLASS` attribute. Modules without one are searched for the first
+    concrete WidgetPlugin subclass they contain. The result is cached, so bars
+    created for additional monitors reuse it.
+
+    Args:
+        plugin_module_path (str): The import path of the plugin module.
+
+    Returns:
+        type[WidgetPlugin]: The WidgetPlugin class provided by the module.
+
+    Raises:
+        RuntimeError: If the module does not provide a WidgetPlugin class.
+    """
+    if plugin_module_path in _plugin_classes:
+        return _plugin_classes[plugin_module_path]
+
+    module = importlib.import_module(plugin_module_path)
+    plugin_class = getattr(module, "PLUGIN_CLASS", None)
+    if plugin_class is None:
+        for value in module.__dict__.values():
+            if (
+                isinstance(value, type)
+                and issubclass(value, WidgetPlugin)
+                and not value.__abstractmethods__
+            ):
+                plugin_class = value
+                break
+        else:
+            raise RuntimeError(
+                "No widget plugin found in {}".format(plugin_module_path)
+            )
+
+    _plugin_classes[plugin_module_path] = plugin_class
+    return plugin_class
@@ -0,0 +1,94 @@
+import hashlib
+import os
+import pickle
+import tempfile
+
+
+CACHE_DIGEST_SIZE = 16
+
+
+def get_cache_dir() -> str:
+    """Get the directory in which parsed config files are cached.
+
+    Returns:
+        str: The cinnabar directory inside of $XDG_CACHE_HOME, or ~/.cache if
+            XDG_CACHE_HOME is not set.
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"),
+        ".cache",
+    )
+    return os.path.join(cache_home, "cinnabar")
+
+
+def load_config(path: str) -> dict:
+    """Load the config file at the given path.
+
+    Parsed config files are cached, keyed by the size, modification time, and
+    contents of the config file, so that the config file is only parsed again
+    when it has changed.
+
+    Args:
+        path (str): The path of the config file to load.
+
+    Returns:
+        dict: The configuration loaded from the config file.
+
+    Raises:
+        RuntimeError: If the config file does not contain a dictionary.
+    """
+    path_digest = hashlib.blake2b(
+        os.path.abspath(path).encode(),
+        digest_size=CACHE_DIGEST_SIZE,
+    ).hexdigest()
+    cache_path = os.path.join(get_cache_dir(), path_digest + ".pkl")
+
+    stat = os.stat(path)
+    cached = _read_cache(cache_path)
+    if cached and cached[0] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+
+    # The config is read unbuffered in a single call, which sizes its read
+    # buffer from the file size, and is then parsed from memory.
+    with open(path, "rb", buffering=0) as f:
+        data = f.read()
+    digest = hashlib.blake2b(data, digest_size=CACHE_DIGEST_SIZE).digest()
+
+    if cached and cached[1] == digest:
+        config = cached[2]
+    else:
+        # The parser is only imported when the config actually needs parsing,
+        # so launches served from the cache never import it.
+        import nestedtext
+
+        config = nestedtext.loads(data.decode("utf-8"))
+        if not isinstance(config, dict):
+            raise RuntimeError("Invalid config file.")
+
+    cache_key = (stat.st_mtime_ns, stat.st_size)
+    _write_cache(cache_path, (cache_key, digest, config))
+    return config
+
+
+def _read_cache(cache_path: str) -> tuple | None:
+    try:
+        with open(cache_path, "rb") as f:
+            return pickle.load(f)
+    except Exception:
+        # A missing or unreadable cache just means the config gets parsed.
+        return None
+
+
+def _write_cache(cache_path: str, entry: tuple) -> None:
+    try:
+        cache_dir = os.path.dirname(cache_path)
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # Write to a temporary file first so that a concurrently starting bar
+        # never reads a partially written cache file.
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir)
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(entry, f, protocol=5)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        return
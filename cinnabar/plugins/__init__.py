@@ -0,0 +1,17 @@
+import importlib
+from types import ModuleType
+
+
+__all__ = ["clock", "dummy", "sway_workspaces", "tray"]
+
+
+def __getattr__(name: str) -> ModuleType:
+    # Plugin modules are only imported when they are first used, so that the
+    # dependencies of plugins which are not configured (such as sdbus for the
+    # tray) are never loaded.
+    if name in __all__:
+        return importlib.import_module("{}.{}".format(__name__, name))
+
+    raise AttributeError(
+        "module {!r} has no attribute {!r}".format(__name__, name)
+    )
@@ -1,6 +1,7 @@
 from datetime import datetime
 
-from gi.repository import GObject, Gtk
+import cinnabar._gi_init  # noqa: F401
+from gi.repository import GLib, Gtk
 
 from cinnabar.bar import Bar, WidgetPlugin
 
@@ -9,13 +10,72 @@ class Clock(WidgetPlugin):
     def __init__(self, _: Bar, config: dict) -> None:
         self._label = Gtk.Label()
         self._config = config
+        self._clock_str = None
+        self._timeout_source = None
+        self._strftime_format = get_strftime_format(config["format"])
         self.update_clock()
-        GObject.timeout_add(100, self.update_clock)
+
+        if "%f" in self._config["format"]:
+            # Formats with sub-second precision need frequent updates.
+            self._timeout_source = GLib.timeout_add(100, self.update_clock)
+        else:
+            self._schedule_tick()
 
     def update_clock(self):
-        clock_str = self._config["format"].format(datetime.now())
-        self._label.set_label(clock_str)
+        now = datetime.now()
+        if self._strftime_format is not None:
+            clock_str = now.strftime(self._strftime_format)
+        else:
+            clock_str = self._config["format"].format(now)
+
+        # Setting the label notifies and resizes it even when the text is the
+        # same, so only set it when the text has changed.
+        if clock_str != self._clock_str:
+            self._clock_str = clock_str
+            self._label.set_label(clock_str)
         return True
 
     def widget(self) -> Gtk.Widget:
         return self._label
+
+    def dispose(self) -> None:
+        if self._timeout_source is not None:
+            GLib.source_remove(self._timeout_source)
+            self._timeout_source = None
+
+    def _schedule_tick(self) -> None:
+        # Wake up once at the start of the next wall clock second rather than
+        # polling, so the displayed time changes right when the second does.
+        delay_ms = 1000 - datetime.now().microsecond // 1000
+        self._timeout_source = GLib.timeout_add(delay_ms, self._tick)
+
+    def _tick(self) -> bool:
+        self.update_clock()
+        self._schedule_tick()
+        return False
+
+
+def get_strftime_format(format_str: str) -> str | None:
+    """Get the strftime format equivalent to the given clock format.
+
+    Clock formats that consist of a single replacement field, such as
+    "{:%H:%M:%S}", are equivalent to calling strftime with the field's format
+    spec, which avoids going through str.format on every update.
+
+    Args:
+        format_str (str): The clock format from the widget config.
+
+    Returns:
+        str | None: The equivalent strftime format, or None if the clock format
+            is not a single replacement field.
+    """
+    if not (format_str.startswith("{:") and format_str.endswith("}")):
+        return None
+
+    spec = format_str[2:-1]
+    if not spec or "{" in spec or "}" in spec:
+        return None
+    return spec
+
+
+PLUGIN_CLASS = Clock
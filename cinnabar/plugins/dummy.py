@@ -1,3 +1,4 @@
+import cinnabar._gi_init  # noqa: F401
 from gi.repository import Gtk
 
 from cinnabar.bar import Bar, WidgetPlugin
@@ -9,3 +10,6 @@ class DummyModule(WidgetPlugin):
 
     def widget(self) -> Gtk.Widget:
         return Gtk.Label(label="Hello")
+
+
+PLUGIN_CLASS = DummyModule
@@ -1,10 +1,12 @@
+import bisect
 from typing import Callable
 
+import cinnabar._gi_init  # noqa: F401
 from gi.repository import Gtk
 
 from cinnabar.bar import Bar, WidgetPlugin
 from cinnabar.sway import SwayClient, SwayEvent, SwayMessage, SwayResPayload
-from cinnabar.util import find, glib_call_in_main, str_to_bool
+from cinnabar.util import glib_call_in_main, str_to_bool
 
 
 class Workspace:
@@ -14,6 +16,10 @@ class Workspace:
 
     _button: Gtk.Button
     _name: str
+    _sort_key: tuple[int, int]
+
+    _style_classes: set[str]
+    """Style classes currently applied to the workspace button."""
 
     def __init__(
         self,
@@ -24,9 +30,15 @@ class Workspace:
         urgent=False,
     ) -> None:
         self._name = name
+        if name_is_number(name):
+            self._sort_key = (0, int(name))
+        else:
+            self._sort_key = (1, 0)
+
         self._button = Gtk.Button(label=name, visible=True)
         self._button.set_relief(Gtk.ReliefStyle.NONE)
         self._button.connect("pressed", lambda _, n=name: on_press(n))
+        self._style_classes = set()
 
         self.focused = focused
         self.persistent = persistent
@@ -40,9 +52,15 @@ class Workspace:
     def name(self) -> str:
         return self._name
 
+    @property
+    def sort_key(self) -> tuple[int, int]:
+        # Numbered workspaces sort by number, followed by named workspaces in
+        # the order they were added.
+        return self._sort_key
+
     @property
     def focused(self) -> bool:
-        return self.style_context.has_class(Workspace.FOCUSED_CLASS)
+        return Workspace.FOCUSED_CLASS in self._style_classes
 
     @focused.setter
     def focused(self, new_val: bool) -> None:
@@ -50,7 +68,7 @@ class Workspace:
 
     @property
     def persistent(self) -> bool:
-        return self.style_context.has_class(Workspace.PERSISTENT_CLASS)
+        return Workspace.PERSISTENT_CLASS in self._style_classes
 
     @persistent.setter
     def persistent(self, new_val: bool) -> None:
@@ -58,7 +76,7 @@ class Workspace:
 
     @property
     def urgent(self) -> bool:
-        return self.style_context.has_class(Workspace.URGENT_CLASS)
+        return Workspace.URGENT_CLASS in self._style_classes
 
     @urgent.setter
     def urgent(self, new_val: bool) -> None:
@@ -69,20 +87,35 @@ class Workspace:
         return self._button.get_style_context()
 
     def _set_has_class(self, class_name: str, val: bool) -> None:
-        if not self.style_context.has_class(class_name) and val is True:
+        # Track the applied classes on the Python side so that setting a flag
+        # to its current value does not touch the style context at all.
+        has_class = class_name in self._style_classes
+        if not has_class and val is True:
+            self._style_classes.add(class_name)
             self.style_context.add_class(class_name)
-        elif self.style_context.has_class(class_name) and val is False:
+        elif has_class and val is False:
+            self._style_classes.remove(class_name)
             self.style_context.remove_class(class_name)
 
 
 class SwayWorkspaces(WidgetPlugin):
-    _workspaces: list[Workspace] = []
+    _workspaces: list[Workspace]
+    _workspaces_by_name: dict[str, Workspace]
 
     def __init__(self, bar: Bar, config: dict) -> None:
         self._bar = bar
+        self._workspaces = []
+        self._workspaces_by_name = {}
 
         self._all_outputs = str_to_bool(config.get("all_outputs", ""))
-        self._persistent_workspaces = config.get("persistent_workspaces", {})
+
+        # The outputs of persistent workspaces are fixed by the config, so the
+        # ones shown on this bar only need to be determined once.
+        persistent_workspaces = config.get("persistent_workspaces") or {}
+        self._persistent_workspaces = [
+            name for name, outputs in persistent_workspaces.items()
+            if self._in_bar_output(self._validate_outputs(outputs))
+        ]
 
         self._sway_client = SwayClient()
         self._button_box = Gtk.Box()
@@ -99,6 +132,9 @@ class SwayWorkspaces(WidgetPlugin):
     def widget(self) -> Gtk.Widget:
         return self._button_box
 
+    def dispose(self) -> None:
+        self._sway_client.shutdown()
+
     @glib_call_in_main
     def _init_workspaces(self, _, payload: SwayResPayload) -> None:
         # TODO: This is kind of clunky...
@@ -116,14 +152,12 @@ class SwayWorkspaces(WidgetPlugin):
                     urgent=bool(workspace.get("urgent", None))
                 )
 
-        for name, outputs in self._persistent_workspaces.items():
-            outputs = self._validate_outputs(outputs)
-            if self._in_bar_output(outputs):
-                existing = find(lambda w: w.name == name, self._workspaces)
-                if existing:
-                    existing.persistent = True
-                else:
-                    self._add_workspace(name=name, persistent=True)
+        for name in self._persistent_workspaces:
+            existing = self._workspaces_by_name.get(name)
+            if existing:
+                existing.persistent = True
+            else:
+                self._add_workspace(name=name, persistent=True)
 
     @glib_call_in_main
     def _handle_sway_event(
@@ -154,9 +188,8 @@ class SwayWorkspaces(WidgetPlugin):
         persistent=False,
         urgent=False,
     ) -> None:
-        for workspace in self._workspaces:
-            if workspace.name == name:
-                return
+        if name in self._workspaces_by_name:
+            return
 
         new_workspace = Workspace(
             name=name,
@@ -166,23 +199,28 @@ class SwayWorkspaces(WidgetPlugin):
             urgent=urgent,
         )
 
-        self._workspaces.append(new_workspace)
-        self._workspaces = sort_workspaces(self._workspaces)
+        position = bisect.bisect_right(
+            self._workspaces,
+            new_workspace.sort_key,
+            key=lambda w: w.sort_key,
+        )
+        self._workspaces_by_name[name] = new_workspace
+        self._workspaces.insert(position, new_workspace)
 
-        position = self._workspaces.index(new_workspace)
+        # Buttons are packed at the end of the box, so they only need to be
+        # moved when the workspace does not sort last.
         self._button_box.pack_start(new_workspace.button, False, False, 0)
-        self._button_box.reorder_child(new_workspace.button, position)
+        if position != len(self._workspaces) - 1:
+            self._button_box.reorder_child(new_workspace.button, position)
 
     def _remove_workspace(self, name: str) -> None:
-        for i in range(0, len(self._workspaces)):
-            workspace = self._workspaces[i]
-            if workspace.name == name:
-                if workspace.persistent:
-                    return
-                else:
-                    self._button_box.remove(workspace.button)
-                    del self._workspaces[i]
-                    return
+        workspace = self._workspaces_by_name.get(name)
+        if workspace is None or workspace.persistent:
+            return
+
+        self._button_box.remove(workspace.button)
+        del self._workspaces_by_name[name]
+        self._workspaces.remove(workspace)
 
     def _button_pressed(self, name: str) -> None:
         payload = "workspace {}".format(name)
@@ -201,22 +239,7 @@ class SwayWorkspaces(WidgetPlugin):
 
 
 def name_is_number(name: str) -> bool:
-    try:
-        int(name)
-        return True
-    except ValueError:
-        return False
+    return name.isdecimal()
 
 
-def sort_workspaces(workspaces: list[Workspace]) -> list[Workspace]:
-    numbered = []
-    unnumbered = []
-
-    for workspace in workspaces:
-        if name_is_number(workspace.name):
-            numbered.append(workspace)
-        else:
-            unnumbered.append(workspace)
-
-    numbered.sort(key=lambda w: int(w.name))
-    return numbered + unnumbered
+PLUGIN_CLASS = SwayWorkspaces
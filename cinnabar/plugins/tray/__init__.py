@@ -1 +1,4 @@
 from cinnabar.plugins.tray.plugin import Tray
+
+
+PLUGIN_CLASS = Tray
@@ -1,12 +1,15 @@
 import asyncio
-import threading
+import functools
 from concurrent.futures import Future
 from typing import Coroutine
 
-from gi.repository import Gdk, Gtk
+import cairo
+import cinnabar._gi_init  # noqa: F401
+from gi.repository import Gdk, GLib, Gtk
 from loguru import logger
 from sdbus import request_default_bus_name_async
 
+from cinnabar import asyncloop
 from cinnabar.bar import Bar, WidgetPlugin
 from cinnabar.plugins.tray.sni import (
     StatusNotifierHost,
@@ -17,37 +20,67 @@ from cinnabar.plugins.tray.sni import (
 from cinnabar.util import glib_call_in_main
 
 
+MAX_PROPERTY_REQUESTS = 32
+ICON_SURFACE_CACHE_SIZE = 128
+
+_icon_theme_paths: set[str] = set()
+"""Icon theme paths of all items, which the shared icon theme searches."""
+
+_icon_sizes: dict[str, list[int]] = {}
+"""Sizes available in the shared icon theme by icon name, largest first."""
+
+_property_requests = asyncio.Semaphore(MAX_PROPERTY_REQUESTS)
+"""Limits how many items request their properties at the same time."""
+
+
 class AsyncTaskManager:
-    _event_loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
-    _running_tasks: set[Future] = set()
+    _running_tasks: set[Future]
+    """Futures of the tasks that are still running, for cancellation."""
+
+    _cancelled: bool
+    """Whether cancel_all was called, after which new tasks are cancelled."""
 
     def __init__(self) -> None:
-        event_loop_thread = threading.Thread(
-            target=self._event_loop_worker,
-            args=(self._event_loop,),
-            daemon=True,
-        )
-        event_loop_thread.start()
+        self._running_tasks = set()
+        self._cancelled = False
 
     def __del__(self) -> None:
-        for task in self._running_tasks:
+        # The set is changed from the event loop thread, so iterate a copy.
+        for task in list(self._running_tasks):
             task.cancel()
 
     def run(self, coroutine: Coroutine) -> Future:
-        def done(future: Future) -> None:
-            exception = future.exception()
-            if exception:
-                raise exception
-            self._running_tasks.remove(future)
-
-        future = asyncio.run_coroutine_threadsafe(coroutine, self._event_loop)
-        future.add_done_callback(done)
-        self._running_tasks.add(future)
+        future = asyncloop.submit(coroutine)
+        asyncloop.get_loop().call_soon_threadsafe(self._track, future)
         return future
 
-    def _event_loop_worker(self, loop: asyncio.AbstractEventLoop) -> None:
-        asyncio.set_event_loop(loop)
-        loop.run_forever()
+    def cancel_all(self) -> None:
+        # Cancel from the event loop thread, after the futures of tasks that
+        # were already started have been added to the set.
+        self._cancelled = True
+        asyncloop.get_loop().call_soon_threadsafe(self._cancel_running)
+
+    def _cancel_running(self) -> None:
+        for task in list(self._running_tasks):
+            task.cancel()
+
+    def _track(self, future: Future) -> None:
+        # Tasks started by other tasks after cancel_all are cancelled too.
+        if self._cancelled:
+            future.cancel()
+            return
+
+        # This runs on the event loop thread, which is also where the future
+        # completes. Adding the future and its done callback here means the
+        # callback, which runs immediately if the task already finished, is
+        # always registered after the add and can't leave a finished future in
+        # the set.
+        self._running_tasks.add(future)
+        future.add_done_callback(self._done)
+
+    def _done(self, future: Future) -> None:
+        self._running_tasks.discard(future)
+        log_task_failure(future)
 
 
 class Item:
@@ -57,14 +90,11 @@ class Item:
 
     _tray_box: Gtk.Box
     _button: Gtk.Button
-    _icon_theme: Gtk.IconTheme = Gtk.IconTheme()
     _menu: Gtk.Menu
 
     _service: str
     _path: str
 
-    # TODO: are these glib_call_in_main decorations necessary?
-    @glib_call_in_main
     def __init__(
         self,
         task_manager: AsyncTaskManager,
@@ -81,6 +111,14 @@ class Item:
         self._service = service
         self._path = path
 
+        # Items are created on the event loop thread, so only the GTK work is
+        # handed to the main thread. Idle callbacks run in the order they were
+        # added, so the button exists before _load_icon runs.
+        self._create_button()
+        self._task_manager.run(self._load_properties())
+
+    @glib_call_in_main
+    def _create_button(self) -> None:
         self._button = Gtk.Button(
             label="",
             relief=Gtk.ReliefStyle.NONE,
@@ -88,12 +126,11 @@ class Item:
             visible=True,
         )
 
-        self._task_manager.run(self._load_properties())
-
     async def _load_properties(self):
-        properties = await self._item_proxy.properties_get_all_dict(
-            on_unknown_member="ignore"
-        )
+        async with _property_requests:
+            properties = await self._item_proxy.properties_get_all_dict(
+                on_unknown_member="ignore"
+            )
 
         icon_theme_path = properties.get("icon_theme_path")
         icon_name = properties.get("icon_name", "image-missing")
@@ -101,72 +138,140 @@ class Item:
 
     @glib_call_in_main
     def _load_icon(self, icon_theme_path: str | None, icon_name: str):
-        paths = []
-        if icon_theme_path:
-            paths += [icon_theme_path]
-        paths += Gtk.IconTheme.get_default().get_search_path()
-
-        self._icon_theme.set_search_path(paths)
-        self._icon_theme.rescan_if_needed()
-
-        def on_size_allocate(button: Gtk.Button, _) -> None:
-            window = self._tray_box.get_window()
-            scale = window.get_scale_factor() if window is not None else 1
-
-            # Use the height of the button for the icon if the configured icon
-            # size "scalable," else use the configured icon size.
-            btn_height = button.get_children()[0].get_allocated_height()
-            icon_size = btn_height if self._icon_size < 1 else self._icon_size
-
-            sizes = self._icon_theme.get_icon_sizes(icon_name)
-            if len(sizes) > 0 and sizes.count(icon_size) == 0:
-                sizes.sort(reverse=True)
-                icon_size = sizes[0]
-
-            if icon_name:
-                icon_pixbuf = self._icon_theme.load_icon_for_scale(
-                    icon_name,
-                    icon_size,
-                    scale,
-                    Gtk.IconLookupFlags.FORCE_SIZE,
-                )
-
-                if icon_pixbuf is not None:
-                    surface = Gdk.cairo_surface_create_from_pixbuf(
-                        icon_pixbuf,
-                        0,
-                        self._tray_box.get_window(),
-                    )
-                    button.set_image(Gtk.Image.new_from_surface(surface))
-                    button.disconnect(handler_id)
-            # TODO: Add case for handling pixmap directly (no icon name set)
-
-        handler_id = self._button.connect("size_allocate", on_size_allocate)
+        # All items share one icon theme, so its search path is only changed
+        # when an item has a theme path that has not been seen before. Setting
+        # the search path already makes the theme reload on its next lookup,
+        # so it does not need to be rescanned.
+        if icon_theme_path and icon_theme_path not in _icon_theme_paths:
+            _icon_theme_paths.add(icon_theme_path)
+            icon_theme = get_icon_theme()
+            paths = [icon_theme_path] + icon_theme.get_search_path()
+            icon_theme.set_search_path(paths)
+            _icon_sizes.clear()
+            load_icon_surface.cache_clear()
+
         self._tray_box.add(self._button)
 
+        if self._icon_size >= 1:
+            # The icon size is known up front, so the icon can be set right
+            # away instead of waiting for the button to be allocated.
+            scale = self._tray_box.get_scale_factor()
+            self._set_icon(icon_name, self._icon_size, scale)
+            return
+
+        self._size_allocate_handler = self._button.connect(
+            "size_allocate",
+            self._on_size_allocate,
+            icon_name,
+        )
+
+    def _on_size_allocate(
+        self,
+        button: Gtk.Button,
+        _: Gdk.Rectangle,
+        icon_name: str,
+    ) -> None:
+        scale = self._tray_box.get_scale_factor()
+
+        # The configured icon size is "scalable," so use the height of the
+        # button for the icon.
+        btn_height = button.get_children()[0].get_allocated_height()
+        if self._set_icon(icon_name, btn_height, scale):
+            button.disconnect(self._size_allocate_handler)
+
+    def _set_icon(self, icon_name: str, icon_size: int, scale: int) -> bool:
+        # TODO: Add case for handling pixmap directly (no icon name set)
+        if not icon_name:
+            return False
+
+        sizes = self._get_icon_sizes(icon_name)
+        if len(sizes) > 0 and icon_size not in sizes:
+            icon_size = sizes[0]
+
+        surface = load_icon_surface(
+            get_icon_theme(),
+            icon_name,
+            icon_size,
+            scale,
+        )
+        if surface is None:
+            return False
+
+        self._button.set_image(Gtk.Image.new_from_surface(surface))
+        return True
+
+    def _get_icon_sizes(self, icon_name: str) -> list[int]:
+        # Looking up the sizes walks the icon theme's index, so the result is
+        # cached until the theme's search path changes.
+        sizes = _icon_sizes.get(icon_name)
+        if sizes is None:
+            sizes = sorted(
+                get_icon_theme().get_icon_sizes(icon_name),
+                reverse=True,
+            )
+            _icon_sizes[icon_name] = sizes
+        return sizes
+
 
 class Tray(WidgetPlugin):
-    _watcher: StatusNotifierWatcher = StatusNotifierWatcher()
+    _watcher: StatusNotifierWatcher | None = None
+    """Watcher shared by every tray, since only one can own its bus name."""
+
+    _host: StatusNotifierHost | None = None
+    """Host shared by every tray, started along with the watcher."""
+
+    _watcher_task: Future | None = None
+    """Task exporting the shared watcher, independent of any one tray."""
+
+    _watcher_watch_task: Future | None = None
+    """Task removing watcher items and hosts whose owner leaves the bus."""
+
+    _host_task: Future | None = None
+    """Task running the shared host, independent of any one tray."""
+
     _watcher_proxy: StatusNotifierWatcher
-    _host: StatusNotifierHost = StatusNotifierHost()
-    _task_manager: AsyncTaskManager = AsyncTaskManager()
-    _items: dict = dict()
+    _task_manager: AsyncTaskManager
+    _items: dict[str, Item]
 
     def __init__(self, bar: Bar, config: dict) -> None:
         self._bar = bar
         self._config = config
-        self._task_manager.run(self._start_watcher())
-        self._task_manager.run(self._host.watch())
+        self._items = {}
+        self._task_manager = AsyncTaskManager()
+
+        # The first tray starts the watcher and host, and trays on other bars
+        # only subscribe to the watcher's signals. Their tasks are kept on the
+        # class rather than in this tray's task manager, so that removing the
+        # first tray's bar doesn't cancel them for every other tray.
+        if Tray._watcher is None or Tray._host is None:
+            Tray._watcher = StatusNotifierWatcher()
+            Tray._host = StatusNotifierHost()
+            Tray._watcher_task = asyncloop.submit(
+                self._start_watcher(Tray._watcher)
+            )
+            Tray._watcher_task.add_done_callback(log_task_failure)
+            Tray._watcher_watch_task = asyncloop.submit(
+                Tray._watcher.watch()
+            )
+            Tray._watcher_watch_task.add_done_callback(log_task_failure)
+            Tray._host_task = asyncloop.submit(Tray._host.watch())
+            Tray._host_task.add_done_callback(log_task_failure)
+
+        self._task_manager.run(self._watch_items())
 
         self._box = Gtk.Box()
 
     def widget(self) -> Gtk.Widget:
         return self._box
 
-    async def _start_watcher(self) -> None:
+    def dispose(self) -> None:
+        self._task_manager.cancel_all()
+
+    async def _start_watcher(self, watcher: StatusNotifierWatcher) -> None:
         await request_default_bus_name_async("org.kde.StatusNotifierWatcher")
-        self._watcher.export_to_dbus("/StatusNotifierWatcher")
+        watcher.export_to_dbus("/StatusNotifierWatcher")
 
+    async def _watch_items(self) -> None:
         self._watcher_proxy = StatusNotifierWatcher.new_proxy(
             "org.kde.StatusNotifierWatcher",
             "/StatusNotifierWatcher",
@@ -177,7 +282,7 @@ class Tray(WidgetPlugin):
 
     async def _handle_item_registered(self) -> None:
         async for i in self._watcher_proxy.status_notifier_item_registered:
-            logger.debug(f"Registered item {i} to host.")
+            logger.debug("Registered item {} to host.", i)
             service, path = parse_item_str(i)
             self._items[i] = Item(
                 self._task_manager,
@@ -189,7 +294,7 @@ class Tray(WidgetPlugin):
 
     async def _handle_item_unregistered(self) -> None:
         async for itm in self._watcher_proxy.status_notifier_item_unregistered:
-            logger.debug(f"Removed item {itm} from host.")
+            logger.debug("Removed item {} from host.", itm)
 
     @property
     def icon_size(self):
@@ -199,3 +304,72 @@ class Tray(WidgetPlugin):
             configured_size = 0
 
         return configured_size
+
+
+@functools.cache
+def get_icon_theme() -> Gtk.IconTheme:
+    """Get the icon theme shared by all tray items.
+
+    The icon theme is created the first time it is needed rather than when the
+    plugin is imported.
+
+    Returns:
+        Gtk.IconTheme: The shared icon theme.
+    """
+    return Gtk.IconTheme()
+
+
+@functools.lru_cache(maxsize=ICON_SURFACE_CACHE_SIZE)
+def load_icon_surface(
+    icon_theme: Gtk.IconTheme,
+    icon_name: str,
+    icon_size: int,
+    scale: int,
+) -> cairo.Surface | None:
+    """Load an icon from the given icon theme into a cairo surface.
+
+    Surfaces are cached, so items showing the same icon share one decoded
+    surface. The cache must be cleared when the icon theme's search path
+    changes.
+
+    Args:
+        icon_theme (Gtk.IconTheme): The icon theme to load the icon from.
+        icon_name (str): The name of the icon to load.
+        icon_size (int): The size of the icon, in application pixels.
+        scale (int): The scale factor of the display the icon is shown on.
+
+    Returns:
+        cairo.Surface | None: The icon surface, or None if the icon could not
+            be loaded.
+    """
+    try:
+        icon_pixbuf = icon_theme.load_icon_for_scale(
+            icon_name,
+            icon_size,
+            scale,
+            Gtk.IconLookupFlags.FORCE_SIZE,
+        )
+    except GLib.Error:
+        # The icon theme raises rather than returning None for missing icons.
+        return None
+    if icon_pixbuf is None:
+        return None
+
+    return Gdk.cairo_surface_create_from_pixbuf(icon_pixbuf, scale, None)
+
+
+def log_task_failure(future: Future) -> None:
+    """Log the exception of a finished tray task, if it raised one.
+
+    Raising from a done callback would only reach the event loop's exception
+    handler, so failures are logged instead.
+
+    Args:
+        future (Future): The finished future of the task.
+    """
+    if future.cancelled():
+        return
+
+    exception = future.exception()
+    if exception:
+        logger.opt(exception=exception).error("Tray task failed.")
@@ -1,4 +1,7 @@
+import asyncio
+import functools
 import os
+from collections.abc import AsyncIterator
 
 from loguru import logger
 from sdbus_async.dbus_daemon import FreedesktopDbus
@@ -12,6 +15,12 @@ from sdbus import (
 
 
 SNIPixmap = tuple[int, int, bytes]
+NameOwnerChange = tuple[str, str, str]
+
+DEFAULT_ITEM_PATH = "/StatusNotifierItem"
+
+_name_owner_queues: list[asyncio.Queue[NameOwnerChange]] = []
+_name_owner_task: asyncio.Task | None = None
 
 
 class StatusNotifierItem(
@@ -132,49 +141,56 @@ class StatusNotifierWatcher(
     # of the org.freedesktop.* variants.
     interface_name="org.kde.StatusNotifierWatcher",
 ):
-    _hosts: list[str] = []
-    _items: list[str] = []
+    _hosts: list[str]
+    _host_set: set[str]
+    _items: list[str]
+    _item_set: set[str]
+
+    _items_by_service: dict[str, list[str]]
+    """Registered items, keyed by the bus name of the service owning them."""
 
     def __init__(self) -> None:
         super().__init__()
-        self._dbus = FreedesktopDbus.new_proxy(
-            "org.freedesktop.DBus",
-            "/org/freedesktop/DBus",
-        )
+        self._hosts = []
+        self._host_set = set()
+        self._items = []
+        self._item_set = set()
+        self._items_by_service = {}
 
     @dbus_method_async(input_signature="s", result_signature="")
     async def register_status_notifier_host(self, host: str) -> None:
-        if host in self._hosts:
-            logger.debug(f"Host {host} already registered to watcher.")
+        if host in self._host_set:
+            logger.debug("Host {} already registered to watcher.", host)
             return
 
         self._hosts.append(host)
+        self._host_set.add(host)
         self.status_notifier_host_registered.emit(host)
-        logger.debug(f"Registered new host {host} to watcher.")
+        logger.debug("Registered new host {} to watcher.", host)
 
     @dbus_method_async(input_signature="s", result_signature="")
     async def register_status_notifier_item(
         self,
         service_or_path: str,
     ) -> None:
-        self._items.append(service_or_path)
-        print(service_or_path)
-        if service_or_path[0] == "/":
+        if service_or_path.startswith("/"):
             service = get_current_message().sender or ""
             path = service_or_path
         else:
             service = service_or_path
-            path = "/StatusNotifierItem"
+            path = DEFAULT_ITEM_PATH
 
         item = service + path
 
-        if item in self._items:
-            logger.debug(f"Item {item} already registered to watcher.")
+        if item in self._item_set:
+            logger.debug("Item {} already registered to watcher.", item)
             return
 
         self._items.append(item)
+        self._item_set.add(item)
+        self._items_by_service.setdefault(service, []).append(item)
         self.status_notifier_item_registered.emit(item)
-        logger.debug(f"Registered new item {item} to watcher.")
+        logger.debug("Registered new item {} to watcher.", item)
 
     @dbus_property_async(property_signature="as")
     def registered_status_notifier_items(self) -> list[str]:
@@ -201,25 +217,33 @@ class StatusNotifierWatcher(
         raise NotImplementedError
 
     async def watch(self) -> None:
-        async for payload in self._dbus.name_owner_changed:
+        async for payload in name_owner_changes():
             service, _, new_owner = payload
 
             if not new_owner:
-                removed_items = list(filter(
-                    lambda i: i.startswith(service),
-                    self._items,
-                ))
-                self._items = list(filter(
-                    lambda i: not i.startswith(service),
-                    self._items,
-                ))
-                if service in self._hosts:
+                # Names are released for every client leaving the bus, so
+                # skip the ones that never registered with the watcher.
+                if (
+                    service not in self._items_by_service
+                    and service not in self._host_set
+                ):
+                    continue
+
+                removed_items = self._items_by_service.pop(service, [])
+                if removed_items:
+                    self._item_set.difference_update(removed_items)
+                    self._items = [
+                        i for i in self._items if i in self._item_set
+                    ]
+
+                if service in self._host_set:
+                    self._host_set.remove(service)
                     self._hosts.remove(service)
-                    logger.debug(f"Removed host {service} from watcher.")
+                    logger.debug("Removed host {} from watcher.", service)
 
                 for item in removed_items:
                     self.status_notifier_item_unregistered.emit(item)
-                    logger.debug(f"Removed item {item} from watcher.")
+                    logger.debug("Removed item {} from watcher.", item)
 
 
 class StatusNotifierHost(
@@ -228,10 +252,6 @@ class StatusNotifierHost(
 ):
     def __init__(self) -> None:
         super().__init__()
-        self._dbus = FreedesktopDbus.new_proxy(
-            "org.freedesktop.DBus",
-            "/org/freedesktop/DBus",
-        )
         self._watcher = StatusNotifierWatcher.new_proxy(
             "org.kde.StatusNotifierWatcher",
             "/StatusNotifierWatcher",
@@ -239,7 +259,7 @@ class StatusNotifierHost(
         self._service_name = f"org.kde.StatusNotifierHost-{os.getpid()}"
 
     async def watch(self) -> None:
-        async for payload in self._dbus.name_owner_changed:
+        async for payload in name_owner_changes():
             service, old_owner, _ = payload
 
             if not old_owner and service == "org.kde.StatusNotifierWatcher":
@@ -249,7 +269,43 @@ class StatusNotifierHost(
 
 
 def parse_item_str(item: str) -> tuple[str, str]:
-    sep_idx = item.index("/")
-    service = item[0:sep_idx]
-    path = item[sep_idx:]
-    return (service, path)
+    service, sep, path = item.partition("/")
+    return (service, sep + path)
+
+
+async def name_owner_changes() -> AsyncIterator[NameOwnerChange]:
+    """Iterate over the NameOwnerChanged signals of the session bus.
+
+    Every subscriber is fed from a single subscription to the signal, so the
+    watcher and host don't each add a match rule for a signal that fires for
+    every client on the bus.
+
+    Yields:
+        NameOwnerChange: The name, old owner, and new owner of each change.
+    """
+    global _name_owner_task
+
+    queue: asyncio.Queue[NameOwnerChange] = asyncio.Queue()
+    _name_owner_queues.append(queue)
+    if _name_owner_task is None:
+        _name_owner_task = asyncio.create_task(_broadcast_name_owner_changes())
+
+    try:
+        while True:
+            yield await queue.get()
+    finally:
+        _name_owner_queues.remove(queue)
+
+
+@functools.cache
+def _freedesktop_dbus() -> FreedesktopDbus:
+    return FreedesktopDbus.new_proxy(
+        "org.freedesktop.DBus",
+        "/org/freedesktop/DBus",
+    )
+
+
+async def _broadcast_name_owner_changes() -> None:
+    async for payload in _freedesktop_dbus().name_owner_changed:
+        for queue in _name_owner_queues:
+            queue.put_nowait(payload)
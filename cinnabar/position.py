@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from enum import Enum
+
+
+class BarPosition(Enum):
+    TOP = "top"
+    BOTTOM = "bottom"
+    LEFT = "left"
+    RIGHT = "right"
+
+    @classmethod
+    def from_str(cls, string: str) -> BarPosition:
+        # Enum value lookup is a dict lookup, and the values are the lower
+        # case names of the positions.
+        try:
+            return cls(string.lower())
+        except ValueError:
+            raise ValueError(
+                "{!r} is not a valid BarPosition, "
+                "must be top, bottom, left, or right".format(string)
+            ) from None
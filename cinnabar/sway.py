@@ -1,23 +1,32 @@
+import functools
 import json
 import os
 import queue
+import selectors
 import socket
+import struct
 import subprocess
-import sys
 import threading
 from enum import Enum
 from typing import Any, Callable, Dict, List, Optional, Union
 
+# orjson parses large responses like GET_TREE considerably faster, so use it
+# for decoding payloads when it is installed.
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
 
 MAGIC_STR = b"i3-ipc"
-MAGIC_STR_LEN = len(MAGIC_STR)
-PAYLOAD_LENGTH_LEN = 4
-PAYLOAD_TYPE_LEN = 4
-PAYLOAD_LENGTH_BEGIN = MAGIC_STR_LEN
-PAYLOAD_LENGTH_END = PAYLOAD_LENGTH_BEGIN + PAYLOAD_LENGTH_LEN
-PAYLOAD_TYPE_BEGIN = PAYLOAD_LENGTH_END
-PAYLOAD_TYPE_END = PAYLOAD_TYPE_BEGIN + PAYLOAD_TYPE_LEN
-HEADER_LEN = MAGIC_STR_LEN + PAYLOAD_LENGTH_LEN + PAYLOAD_TYPE_LEN
+
+# The header is the magic string followed by the payload length and payload
+# type, both as native byte order 32-bit integers.
+HEADER = struct.Struct("={}sII".format(len(MAGIC_STR)))
+HEADER_LEN = HEADER.size
+
+WAKE_READ_SIZE = 512
+MAX_MESSAGE_BATCH = 16
 
 
 class SwayMessage(Enum):
@@ -60,10 +69,20 @@ class SwayEvent(Enum):
         return self.name.lower()
 
 
+_PAYLOAD_TYPES: dict[int, Union[SwayMessage, SwayEvent]] = {
+    i.value: i for i in (*SwayMessage, *SwayEvent)
+}
+"""Sway message and event types, keyed by their IPC payload type."""
+
+_EVENT_NAMES: dict[SwayEvent, str] = {i: str(i) for i in SwayEvent}
+"""Names used to subscribe to each Sway event."""
+
+
 SwayResPayload = Union[Dict[str, Any], List[Any]]
 SwayResHandler = Callable[[SwayMessage, SwayResPayload], None]
 SwayEventHandler = Callable[[SwayEvent, SwayResPayload], None]
-SwayMessageQueue = queue.Queue[tuple[SwayMessage, str, SwayResHandler]]
+SwayPayload = str | bytes
+SwayMessageQueue = queue.Queue[tuple[SwayMessage, SwayPayload, SwayResHandler]]
 
 
 def _do_nothing(*_) -> None:
@@ -77,12 +96,18 @@ class SwayClient:
     _consumer_stop: Optional[threading.Event]
     """Thread event for stopping the consumer thread."""
 
+    _consumer_wake: Optional[int]
+    """Write end of the pipe that wakes the consumer thread."""
+
     _event_thread: Optional[threading.Thread]
     """Thread that waits for and handles events from Sway."""
 
     _event_stop: Optional[threading.Event]
     """Thread event for stopping the event thread."""
 
+    _event_wake: Optional[int]
+    """Write end of the pipe that wakes the event thread."""
+
     _message_queue: SwayMessageQueue
     """Queue of messages to be dispatched to Sway."""
 
@@ -92,11 +117,16 @@ class SwayClient:
         Initialize the Sway client and open a connection to Sway for sending
         messages.
         """
+        self._event_thread = None
+        self._event_stop = None
+        self._event_wake = None
+
         self._message_queue = queue.Queue()
         self._consumer_stop = threading.Event()
+        wake_fd, self._consumer_wake = _wake_pipe()
         self._consumer_thread = threading.Thread(
             target=message_dispatch_worker,
-            args=(self._message_queue, self._consumer_stop),
+            args=(self._message_queue, self._consumer_stop, wake_fd),
             daemon=True,
         )
         self._consumer_thread.start()
@@ -104,18 +134,21 @@ class SwayClient:
     def send(
         self,
         msg: SwayMessage,
-        payload: str,
+        payload: SwayPayload,
         res_handler: SwayResHandler = _do_nothing,
     ) -> None:
         """Send a message with the given payload to Sway via the IPC socket.
 
         Args:
             msg (SwayMessage): The message type to send.
-            payload (str): The payload to send with the message.
+            payload (SwayPayload): The payload to send with the message, as
+                a string or already encoded as UTF-8.
             res_handler (SwayResHandler): The callable that is called when
                 the response is received. The callable must be thread-safe.
         """
         self._message_queue.put((msg, payload, res_handler))
+        if self._consumer_wake is not None:
+            _wake(self._consumer_wake)
 
     def subscribe(
         self,
@@ -132,9 +165,10 @@ class SwayClient:
                 when an event is received.
         """
         self._event_stop = threading.Event()
+        wake_fd, self._event_wake = _wake_pipe()
         self._event_thread = threading.Thread(
             target=event_worker,
-            args=(events, event_handler, self._event_stop),
+            args=(events, event_handler, self._event_stop, wake_fd),
             daemon=True,
         )
         self._event_thread.start()
@@ -145,6 +179,12 @@ class SwayClient:
             self._event_stop.set()
             self._event_stop = None
 
+        # Closing the write end of the pipe wakes the event thread so it sees
+        # that it has been stopped.
+        if self._event_wake is not None:
+            os.close(self._event_wake)
+            self._event_wake = None
+
         self._event_thread = None
 
     def shutdown(self) -> None:
@@ -157,17 +197,23 @@ class SwayClient:
             self._consumer_stop.set()
             self._consumer_stop = None
 
+        if self._consumer_wake is not None:
+            os.close(self._consumer_wake)
+            self._consumer_wake = None
+
         self._consumer_thread = None
 
         self.unsubscribe()
 
 
+@functools.cache
 def get_sway_socket_path() -> str:
     """Find and return the Sway socket path.
 
     Attemps to read the Sway socket path from the SWAYSOCK env var first. If
     not found in the SWAYSOCK env var, attempt to get the socket by calling
-    `sway --get-socketpath`.
+    `sway --get-socketpath`. The path is only looked up once and then reused
+    by every connection to Sway.
 
     Returns:
         str: The Sway socket path.
@@ -177,7 +223,7 @@ def get_sway_socket_path() -> str:
     """
     path = os.environ.get("SWAYSOCK")
 
-    if path is None:
+    if not path:
         proc = subprocess.run(
             ["sway", "--get-socketpath"],
             capture_output=True,
@@ -185,7 +231,7 @@ def get_sway_socket_path() -> str:
         )
         path = proc.stdout.strip()
 
-    if path is None:
+    if not path:
         raise RuntimeError("SWAYSOCK env var is not set")
     return path
 
@@ -193,6 +239,7 @@ def get_sway_socket_path() -> str:
 def message_dispatch_worker(
     messages: SwayMessageQueue,
     stop_event: threading.Event,
+    wake_fd: int,
 ) -> None:
     """Worker for dispatching messages to Sway from the given queue.
 
@@ -203,33 +250,57 @@ def message_dispatch_worker(
     Args:
         messages (SwayMessageQueue): The queue of messages to be dispatched.
         stop_event (thread.Event): When set, stop_event will stop the worker.
+        wake_fd (int): The read end of a pipe that is written to whenever a
+            message is queued, and closed when the worker is stopped.
     """
     cmd_sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
     cmd_sock.connect(get_sway_socket_path())
 
-    while True:
-        # Set a timeout in order to stop reading from the message queue if the
-        # thread is stopped.
-        try:
-            message, payload, res_handler = messages.get(block=True, timeout=1)
-        except queue.Empty:
-            # End the thread if the thread has been marked as stopped.
+    try:
+        while True:
+            # Block until a message is queued or the worker is stopped, rather
+            # than polling the queue.
+            os.read(wake_fd, WAKE_READ_SIZE)
             if stop_event.is_set():
                 return
-            else:
-                continue
-
-        send_sway_msg(cmd_sock, message, payload)
 
-        res_type, res_payload = recv_sway_msg(cmd_sock)
-        if isinstance(res_type, SwayMessage):
-            res_handler(res_type, res_payload)
+            while True:
+                batch = []
+                while len(batch) < MAX_MESSAGE_BATCH:
+                    try:
+                        batch.append(messages.get_nowait())
+                    except queue.Empty:
+                        break
+
+                if not batch:
+                    break
+
+                # Send every queued message at once, and then read the
+                # responses, which Sway sends back in the same order.
+                cmd_sock.sendall(b"".join(
+                    encode_sway_msg(message, payload)
+                    for message, payload, _ in batch
+                ))
+
+                for _, _, res_handler in batch:
+                    res_type, res_payload = recv_sway_msg_raw(cmd_sock)
+
+                    # Most commands are sent without a response handler, so
+                    # only decode the responses that are actually handled.
+                    if res_handler is _do_nothing:
+                        continue
+                    if isinstance(res_type, SwayMessage):
+                        res_handler(res_type, _json_loads(res_payload))
+    finally:
+        cmd_sock.close()
+        os.close(wake_fd)
 
 
 def event_worker(
     events: list[SwayEvent],
     event_handler: SwayEventHandler,
     stop_event: threading.Event,
+    wake_fd: int,
 ) -> None:
     """Worker for subscribing to Sway events.
 
@@ -241,53 +312,76 @@ def event_worker(
         event_handler (SwayEventHandler): The callable that is called when Sway
             event is received. The callable must be thread safe.
         stop_event (thread.Event): When set, stop_event will stop the worker.
+        wake_fd (int): The read end of a pipe that is closed when the worker
+            is stopped.
     """
     sub_sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
     sub_sock.connect(get_sway_socket_path())
+    selector = selectors.DefaultSelector()
 
-    # Set a timeout in order to stop reading from the socket if the thread is
-    # stopped.
-    sub_sock.settimeout(1)
+    try:
+        str_events = [_EVENT_NAMES[e] for e in events]
+        sub_payload = json.dumps(str_events).encode()
+        send_sway_msg(sub_sock, SwayMessage.SUBSCRIBE, sub_payload)
+        _, res_payload = recv_sway_msg(sub_sock)
 
-    str_events = list(map(lambda e: str(e), events))
-    send_sway_msg(sub_sock, SwayMessage.SUBSCRIBE, json.dumps(str_events))
-    _, res_payload = recv_sway_msg(sub_sock)
+        if not res_payload.get("success"):
+            raise RuntimeError("Failed to subscribe to Sway events.")
 
-    if not res_payload.get("success"):
-        raise RuntimeError("Failed to subscribe to Sway events.")
+        # Wait on both the socket and the wake pipe, so that the worker sleeps
+        # until either an event arrives or it is stopped.
+        selector.register(sub_sock, selectors.EVENT_READ)
+        selector.register(wake_fd, selectors.EVENT_READ)
 
-    while True:
-        try:
-            event_type, event_payload = recv_sway_msg(sub_sock)
-        except socket.timeout:
-            # End the thread if the thread has been marked as stopped.
+        while True:
+            selector.select()
             if stop_event.is_set():
                 return
-            else:
-                continue
 
-        if isinstance(event_type, SwayEvent):
-            event_handler(event_type, event_payload)
-
-
-def send_sway_msg(sock: socket.socket, msg: SwayMessage, payload: str) -> None:
+            event_type, event_payload = recv_sway_msg(sub_sock)
+            if isinstance(event_type, SwayEvent):
+                event_handler(event_type, event_payload)
+    finally:
+        selector.close()
+        sub_sock.close()
+        os.close(wake_fd)
+
+
+def send_sway_msg(
+    sock: socket.socket,
+    msg: SwayMessage,
+    payload: SwayPayload,
+) -> None:
     """Send a Sway message through the given socket.
 
     Args:
         sock (socket.socket): The socket through which to send the message.
         msg (SwayMessage): The Sway message to be sent.
-        payload (str): The payload to be sent along with the Sway message.
+        payload (SwayPayload): The payload to be sent along with the Sway
+            message, as a string or already encoded as UTF-8.
     """
-    payload_length = len(payload)
-    payload_type = msg.value
+    sock.sendall(encode_sway_msg(msg, payload))
+
 
-    # Encode and send the message
-    data = MAGIC_STR
-    data += payload_length.to_bytes(PAYLOAD_LENGTH_LEN, sys.byteorder)
-    data += payload_type.to_bytes(PAYLOAD_TYPE_LEN, sys.byteorder)
-    data += payload.encode()
+def encode_sway_msg(msg: SwayMessage, payload: SwayPayload) -> bytes:
+    """Encode a Sway message for sending through the IPC socket.
 
-    sock.sendall(data)
+    Args:
+        msg (SwayMessage): The Sway message to be encoded.
+        payload (SwayPayload): The payload to be sent along with the Sway
+            message, as a string or already encoded as UTF-8.
+
+    Returns:
+        bytes: The message header followed by the encoded payload.
+    """
+    # The payload length in the header is in bytes, so encode string payloads
+    # before measuring them.
+    if isinstance(payload, str):
+        payload_bytes = payload.encode()
+    else:
+        payload_bytes = payload
+    header = HEADER.pack(MAGIC_STR, len(payload_bytes), msg.value)
+    return header + payload_bytes
 
 
 def recv_sway_msg(sock: socket.socket) -> tuple[SwayMessage | SwayEvent, dict]:
@@ -301,38 +395,74 @@ def recv_sway_msg(sock: socket.socket) -> tuple[SwayMessage | SwayEvent, dict]:
             response and a dictionary containing the response payload.
 
     Raises:
-        RuntimeError: If the Sway response type cannot be determined.
+        RuntimeError: If the Sway response type cannot be determined, or if
+            the socket is closed before the response is received in full.
+    """
+    payload_type, recv_payload = recv_sway_msg_raw(sock)
+    return payload_type, _json_loads(recv_payload)
+
+
+def recv_sway_msg_raw(
+    sock: socket.socket,
+) -> tuple[SwayMessage | SwayEvent, bytearray]:
+    """Receive a response to a Sway message without decoding its payload.
+
+    Args:
+        sock (socket.socket): The socket from which to receive the response.
+
+    Returns:
+        tuple[SwayMessage | SwayEvent, bytearray]: A tuple containing the type
+            of response and the undecoded JSON response payload.
+
+    Raises:
+        RuntimeError: If the Sway response type cannot be determined, or if
+            the socket is closed before the response is received in full.
     """
     # Receive the response header, which is always the same length
-    recv_header = b""
-    while len(recv_header) < HEADER_LEN:
-        recv_header += sock.recv(HEADER_LEN-len(recv_header))
-
-    # Pull the response payload length out of the response header
-    recv_payload_len = int.from_bytes(
-        recv_header[PAYLOAD_LENGTH_BEGIN:PAYLOAD_LENGTH_END],
-        sys.byteorder,
-    )
-
-    # Pull the response payload type out of the response header
-    recv_payload_type = int.from_bytes(
-        recv_header[PAYLOAD_TYPE_BEGIN:PAYLOAD_TYPE_END],
-        sys.byteorder,
-    )
+    recv_header = _recv_exactly(sock, HEADER_LEN)
+
+    # Pull the response payload length and type out of the response header
+    _, recv_payload_len, recv_payload_type = HEADER.unpack(recv_header)
 
     # Receive response payload in full
-    recv_payload = b""
-    while len(recv_payload) < recv_payload_len:
-        recv_payload += sock.recv(recv_payload_len-len(recv_payload))
-
-    payload_type = None
-    if any(i.value == recv_payload_type for i in SwayMessage):
-        payload_type = SwayMessage(recv_payload_type)
-    elif any(i.value == recv_payload_type for i in SwayEvent):
-        payload_type = SwayEvent(recv_payload_type)
-    else:
+    recv_payload = _recv_exactly(sock, recv_payload_len)
+
+    payload_type = _PAYLOAD_TYPES.get(recv_payload_type)
+    if payload_type is None:
         raise RuntimeError(
             "Unexpected payload type received: {}".format(recv_payload_type)
         )
 
-    return payload_type, json.loads(recv_payload)
+    return payload_type, recv_payload
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytearray:
+    # Receive directly into one preallocated buffer rather than concatenating
+    # chunks, since large responses like GET_TREE arrive in several pieces.
+    buf = bytearray(size)
+    view = memoryview(buf)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:])
+        if n == 0:
+            raise RuntimeError("Sway IPC socket closed.")
+        received += n
+    return buf
+
+
+def _wake_pipe() -> tuple[int, int]:
+    read_fd, write_fd = os.pipe()
+
+    # Writes only need to wake the worker, so never block the writer when the
+    # pipe is already full of unread wakeups.
+    os.set_blocking(write_fd, False)
+    return read_fd, write_fd
+
+
+def _wake(write_fd: int) -> None:
+    # A full pipe already has a wakeup pending, and a broken pipe means the
+    # worker has exited, so neither is an error for the thread waking it.
+    try:
+        os.write(write_fd, b"\0")
+    except (BlockingIOError, BrokenPipeError):
+        pass
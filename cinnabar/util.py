@@ -1,22 +1,30 @@
+import functools
+import threading
 from typing import Any, Callable, Iterable, Optional
 
+import cinnabar._gi_init  # noqa: F401
 from gi.repository import GLib
 
 
+_TRUE_STRINGS = frozenset(("true", "yes", "on", "1"))
+_FALSE_STRINGS = frozenset(("false", "no", "off", "0", ""))
+
+
 def find(fn: Callable, iterable: Iterable) -> Optional[Any]:
-    for i in iterable:
-        if fn(i):
-            return i
-    return None
+    return next(filter(fn, iterable), None)
 
 
 def find_index(fn: Callable, input_list: list) -> Optional[int]:
-    for i in range(0, len(input_list)):
-        if fn(input_list[i]):
-            return i
+    return next((i for i, value in enumerate(input_list) if fn(value)), None)
 
 
-def glib_call_in_main(fn: Callable):
+def glib_call_in_main(fn: Optional[Callable] = None, *, coalesce=False):
+    # Support both the bare decorator and glib_call_in_main(coalesce=True).
+    if fn is None:
+        return functools.partial(glib_call_in_main, coalesce=coalesce)
+    if coalesce:
+        return _coalesced_call_in_main(fn)
+
     # Wrap callable in a method that returns False to make it be removed from
     # event sources after being called by main thread.
     def inner(*args, **kwargs):
@@ -31,6 +39,36 @@ def glib_call_in_main(fn: Callable):
 
 
 def str_to_bool(string: str) -> bool:
-    if string.lower() == "true":
+    value = string.strip().lower()
+    if value in _TRUE_STRINGS:
         return True
-    return False
+    if value in _FALSE_STRINGS:
+        return False
+    raise ValueError(
+        "{!r} is not a valid boolean, must be true or false".format(string)
+    )
+
+
+def _coalesced_call_in_main(fn: Callable):
+    lock = threading.Lock()
+    pending: dict[Any, tuple[tuple, dict]] = {}
+
+    # Calls are keyed by their first argument, which is the instance when
+    # decorating a method, so each object only keeps its latest call.
+    def inner(key: Any) -> bool:
+        with lock:
+            args, kwargs = pending.pop(key)
+        fn(*args, **kwargs)
+        return False
+
+    # Only schedule an idle callback when the key has no call pending, and
+    # otherwise just replace the arguments of the pending call.
+    def wrapper(*args, **kwargs):
+        key = args[0] if args else None
+        with lock:
+            scheduled = key in pending
+            pending[key] = (args, kwargs)
+        if not scheduled:
+            GLib.idle_add(inner, key)
+
+    return wrapper